@@ -0,0 +1,196 @@
+"""
+Shared static UI assets for the Gradio app.
+
+Keeping the stylesheet here means it is parsed exactly once per process,
+no matter how many modules build or reload the Blocks UI. The stylesheet
+is minified once at import time so every page load ships the compact
+form instead of ~4 KB of pretty-printed CSS, and it is materialized to
+static/app.css so Gradio can serve it as a cacheable file (css_paths)
+instead of inlining it into every page.
+"""
+
+import os
+import re
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace in a CSS string."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([:;{},])\s*', r'\1', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+# Custom CSS for a modern and clean look
+_RAW_CSS = """
+:root {
+    /* Dark Theme Palette */
+    --bg-primary: #111827;      /* Darkest Gray */
+    --bg-secondary: #1f2937;     /* Dark Gray */
+    --text-primary: #f9fafb;     /* Off-White */
+    --text-secondary: #9ca3af;   /* Gray */
+    --accent: #3b82f6;           /* Blue */
+    --accent-hover: #2563eb;     /* Darker Blue */
+    --border: #374151;           /* Lighter Dark Gray for borders */
+    --shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
+    --gradient: linear-gradient(135deg, #60a5fa 0%, #3b82f6 100%);
+}
+
+.gradio-container {
+    background: var(--bg-primary) !important;
+    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
+}
+
+.header-container {
+    background: var(--gradient);
+    padding: 1.5rem 0;
+    margin-bottom: 2rem;
+    border-radius: 0 0 24px 24px;
+    box-shadow: var(--shadow);
+}
+
+.header-title {
+    color: white;
+    font-size: 2.25rem;
+    font-weight: 700;
+    text-align: center;
+    margin: 0;
+    text-shadow: 0 2px 4px rgba(0,0,0,0.2);
+}
+
+.page-container {
+    max-width: 900px;
+    margin: 2rem auto;
+    padding: 2rem;
+    background: var(--bg-secondary);
+    border-radius: 16px;
+    box-shadow: var(--shadow);
+    border: 1px solid var(--border);
+}
+
+.page-title {
+    color: var(--text-primary);
+    font-size: 1.75rem;
+    font-weight: 600;
+    text-align: center;
+    margin-bottom: 1.5rem;
+}
+
+.welcome-text {
+    color: var(--text-secondary);
+    font-size: 1.125rem;
+    text-align: center;
+    margin-bottom: 2.5rem;
+}
+
+.apps-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+    gap: 1.5rem;
+}
+
+.app-button {
+    background: var(--bg-secondary) !important;
+    border: 1px solid var(--border) !important;
+    border-radius: 12px !important;
+    padding: 1.5rem !important;
+    transition: all 0.3s ease !important;
+    box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1) !important;
+    color: var(--text-primary) !important;
+    font-weight: 600 !important;
+    font-size: 1rem !important;
+    text-align: left;
+}
+
+.app-button:hover {
+    transform: translateY(-4px);
+    box-shadow: var(--shadow) !important;
+    border-color: var(--accent) !important;
+}
+
+.back-button {
+    background: var(--accent) !important;
+    color: white !important;
+    border: none !important;
+    border-radius: 8px !important;
+    font-weight: 600 !important;
+    margin-bottom: 1.5rem !important;
+    float: left;
+}
+
+.back-button:hover {
+    background: var(--accent-hover) !important;
+}
+
+.gradio-dataframe {
+    width: 100%;
+    border-collapse: collapse;
+    margin-top: 1rem;
+    margin-bottom: 1rem;
+    color: var(--text-primary) !important;
+}
+
+.gradio-dataframe th, .gradio-dataframe td {
+    border: 1px solid var(--border);
+    padding: 0.75rem;
+    text-align: left;
+    white-space: normal; /* Allow text to wrap */
+}
+
+.gradio-dataframe th {
+    background-color: var(--bg-primary);
+    font-weight: 600;
+}
+
+.gradio-textbox, .gradio-button {
+    border-radius: 8px !important;
+}
+
+/* Light palette, applied entirely in CSS when the header checkbox is
+   ticked -- the theme switch never touches JS or the server. */
+body:has(#theme-switch:checked) {
+    --bg-primary: #f8fafc;
+    --bg-secondary: #ffffff;
+    --text-primary: #111827;
+    --text-secondary: #4b5563;
+    --border: #e5e7eb;
+}
+
+.theme-toggle {
+    display: block;
+    text-align: center;
+    cursor: pointer;
+    color: white;
+    font-size: 1.25rem;
+    margin: 0.5rem 0 0;
+}
+"""
+
+# Minified once per process; the standalone tables document still embeds
+# this string directly.
+CSS = _minify_css(_RAW_CSS)
+
+# Served by Gradio as a static asset (gr.Blocks(css_paths=[CSS_PATH])) so
+# the browser caches the stylesheet across page loads instead of
+# re-downloading it inline with every document. Rewritten atomically and
+# only when the content actually changed, keeping mtime (and therefore
+# HTTP caching) stable across restarts.
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "app.css")
+
+
+def _materialize_css(path=CSS_PATH):
+    try:
+        with open(path) as f:
+            if f.read() == CSS:
+                return
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(CSS)
+    os.replace(tmp, path)
+
+
+_materialize_css()
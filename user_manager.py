@@ -4,25 +4,46 @@ Uses SQLAlchemy for database interactions.
 """
 
 import logging
+import os
+import queue
+from contextlib import contextmanager
+import threading
+import time
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import create_engine, Column, String, DateTime, Integer, text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from typing import Iterator, Optional
+from sqlalchemy import create_engine, event, delete, func, select, String, DateTime, Integer, text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
-# Create base class for declarative models
-Base = declarative_base()
+# Module logger: records stay attributable and the level can be tuned per
+# deployment (e.g. USERMGR_LOGLEVEL=WARNING to silence per-call chatter)
+# without touching the root configuration.
+logger = logging.getLogger(__name__)
+_env_level = os.environ.get("USERMGR_LOGLEVEL")
+if _env_level:
+    logger.setLevel(_env_level.upper())
+
+class Base(DeclarativeBase):
+    """Base class for declarative models."""
+    pass
+
 
 class UserLogin(Base):
     """SQLAlchemy model for user login tracking."""
     __tablename__ = 'user_logins'
-    
-    email = Column(String(255), primary_key=True)
-    last_login_time = Column(DateTime, nullable=False)
-    voice_to_text_usage_count = Column(Integer, default=0, nullable=False)
-    text_to_voice_usage_count = Column(Integer, default=0, nullable=False)
-    pdf_chat_usage_count = Column(Integer, default=0, nullable=False)
+
+    # NOCASE collation makes lookups case-insensitive at the index level on
+    # freshly created databases. Callers still normalize with .lower() so
+    # databases created before this change (BINARY collation) keep working.
+    email: Mapped[str] = mapped_column(String(255, collation="NOCASE"), primary_key=True)
+    last_login_time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Epoch-seconds twin of last_login_time; the quota window check is a
+    # single integer subtraction in SQL against this column instead of
+    # datetime parsing and julianday arithmetic per call.
+    last_login_ts: Mapped[Optional[int]] = mapped_column(Integer)
+    voice_to_text_usage_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    text_to_voice_usage_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    pdf_chat_usage_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     
     def __repr__(self):
         return f"<UserLogin(email='{self.email}', last_login_time='{self.last_login_time}', voice_to_text_usage_count={self.voice_to_text_usage_count}, text_to_voice_usage_count={self.text_to_voice_usage_count}, pdf_chat_usage_count={self.pdf_chat_usage_count})>"
@@ -31,18 +52,84 @@ class UserManager:
     """
     Manages user login tracking using SQLite database with SQLAlchemy.
     """
-    
+
+    # The only column names the usage helpers will interpolate into SQL;
+    # everything else reaches the database as a bound parameter.
+    _USAGE_COLUMNS = (
+        "voice_to_text_usage_count",
+        "text_to_voice_usage_count",
+        "pdf_chat_usage_count",
+    )
+
+    # How long a quota-check result may be served from memory. Short on
+    # purpose: repeat checks for the same user within a couple of seconds
+    # (double-fired UI events, back-to-back turns) are the target, and
+    # increments update the cached count in place so it never lags.
+    _QUOTA_CACHE_TTL = 2.0
+
+    # How long the background writer waits to coalesce usage increments
+    # before committing a batch.
+    _WRITE_COALESCE_WINDOW = 0.1
+
     def __init__(self, db_path: str = "users.db"):
         """
         Initialize the UserManager with database connection.
-        
+
         Args:
             db_path (str): Path to the SQLite database file
         """
         self.db_path = db_path
         self.engine = None
         self.SessionLocal = None
+        # Statements are formatted once per usage column here rather than
+        # per call; the per-feature methods were copy-paste clones of each
+        # other differing only by column name.
+        self._delta_stmts = {
+            col: text(
+                f"UPDATE user_logins SET {col} = {col} + :d WHERE email = :e"
+            )
+            for col in self._USAGE_COLUMNS
+        }
+        # COALESCE covers rows from before the epoch column existed: they
+        # act as "just logged in" rather than resetting spuriously.
+        self._check_stmts = {
+            col: text(
+                f"UPDATE user_logins SET {col} = CASE "
+                f"WHEN :now - COALESCE(last_login_ts, :now) > 86400 "
+                f"THEN 0 ELSE {col} END "
+                f"WHERE email = :e RETURNING {col}"
+            )
+            for col in self._USAGE_COLUMNS
+        }
+        # Atomic check-and-consume: the WHERE clause only matches when the
+        # 24h window expired (count restarts at 1) or the count is still
+        # under the limit, so a returned row means the try succeeded and
+        # there is no gap between the check and the increment.
+        self._consume_stmts = {
+            col: text(
+                f"UPDATE user_logins SET {col} = CASE "
+                f"WHEN :now - COALESCE(last_login_ts, :now) > 86400 "
+                f"THEN 1 ELSE {col} + 1 END "
+                f"WHERE email = :e AND "
+                f"(:now - COALESCE(last_login_ts, :now) > 86400 OR {col} < :max) "
+                f"RETURNING {col}"
+            )
+            for col in self._USAGE_COLUMNS
+        }
+        self._count_stmts = {
+            col: text(f"SELECT {col} FROM user_logins WHERE email = :e")
+            for col in self._USAGE_COLUMNS
+        }
+        self._quota_cache = {}  # (email, column) -> (expires_at, count)
+        self._quota_cache_lock = threading.Lock()
         self._setup_database()
+        # Usage increments are fire-and-forget: callers enqueue and one
+        # background thread coalesces and commits them, so no handler ever
+        # waits on a write for a counter bump.
+        self._write_q = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop,
+                                        daemon=True, name="usage-writer")
+        self._writer.start()
     
     def _setup_database(self):
         """Setup database connection and create tables if they don't exist."""
@@ -51,9 +138,33 @@ class UserManager:
             self.engine = create_engine(
                 f"sqlite:///{self.db_path}",
                 echo=False,  # Set to True for SQL query logging
-                pool_pre_ping=True
+                # Local file database: connections can't silently die the
+                # way network ones do, so skip pre-ping's SELECT 1 per
+                # checkout.
+                pool_pre_ping=False,
+                # Wait out a concurrent writer instead of failing fast with
+                # "database is locked" under bursts of UI events.
+                connect_args={"timeout": 30}
             )
-            
+
+            # Tune SQLite on every pooled connection: WAL lets readers run
+            # while a write is in flight (instead of blocking on the
+            # rollback journal), NORMAL drops the per-commit fsync that
+            # FULL pays without risking corruption in WAL mode, a 64 MB
+            # mmap window serves page reads straight from the OS page
+            # cache without read() copies, a 20 MB page cache keeps the
+            # whole table hot, and in-memory temp tables avoid disk churn
+            # for sorts.
+            @event.listens_for(self.engine, "connect")
+            def _set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+                cursor.execute("PRAGMA mmap_size=67108864")
+                cursor.execute("PRAGMA cache_size=-20000")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+                cursor.close()
+
             # Create session factory
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
             
@@ -63,35 +174,71 @@ class UserManager:
             # Run database migrations
             self._run_migrations()
             
-            logging.info(f"Database initialized successfully at {self.db_path}")
+            logger.info("Database initialized successfully at %s", self.db_path)
             
         except SQLAlchemyError as e:
-            logging.error(f"Failed to setup database: {e}")
+            logger.error("Failed to setup database: %s", e)
             raise
     
     def _get_session(self) -> Session:
         """Get a new database session."""
         return self.SessionLocal()
+
+    @staticmethod
+    def _norm(email: Optional[str]) -> Optional[str]:
+        """Return the canonical form of an email address (stripped,
+        lowercased), or None when it is empty or missing. Applied once at
+        each public-method boundary so internals never re-normalize."""
+        if not email:
+            return None
+        normalized = email.strip().lower()
+        return normalized or None
+
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """Provide a transactional scope: commit on success, roll back on
+        error, always close. Callers making several ORM calls in a row can
+        open one scope instead of paying session setup per call."""
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
     
     def _run_migrations(self):
         """Run database migrations to add new columns if they don't exist."""
         try:
-            with self._get_session() as session:
+            with self.session_scope() as session:
                 # Check if pdf_chat_usage_count column exists
                 result = session.execute(text("PRAGMA table_info(user_logins)"))
                 columns = [row[1] for row in result.fetchall()]
                 
                 if 'pdf_chat_usage_count' not in columns:
-                    logging.info("Adding pdf_chat_usage_count column to user_logins table")
+                    logger.info("Adding pdf_chat_usage_count column to user_logins table")
                     session.execute(text("ALTER TABLE user_logins ADD COLUMN pdf_chat_usage_count INTEGER DEFAULT 0 NOT NULL"))
-                    session.commit()
-                    logging.info("Successfully added pdf_chat_usage_count column")
-                
+                    logger.info("Successfully added pdf_chat_usage_count column")
+
+                if 'last_login_ts' not in columns:
+                    logger.info("Adding last_login_ts column to user_logins table")
+                    session.execute(text("ALTER TABLE user_logins ADD COLUMN last_login_ts INTEGER"))
+                    # Backfill from the stored local timestamps; the 'utc'
+                    # modifier converts them to true epoch seconds.
+                    session.execute(text(
+                        "UPDATE user_logins "
+                        "SET last_login_ts = CAST(strftime('%s', last_login_time, 'utc') AS INTEGER) "
+                        "WHERE last_login_ts IS NULL"
+                    ))
+                    logger.info("Successfully added last_login_ts column")
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to run migrations: {e}")
+            logger.error("Failed to run migrations: %s", e)
             # Don't raise here, as the database might still be usable
         except Exception as e:
-            logging.error(f"Unexpected error during migrations: {e}")
+            logger.error("Unexpected error during migrations: %s", e)
             # Don't raise here, as the database might still be usable
     
     def record_login(self, email: str) -> bool:
@@ -104,41 +251,39 @@ class UserManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        if not email or not email.strip():
-            logging.warning("Empty email provided for login recording")
+        normalized = self._norm(email)
+        if normalized is None:
+            logger.warning("Empty email provided for login recording")
             return False
-        
+
         try:
-            with self._get_session() as session:
-                # Check if user exists
-                existing_user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                current_time = datetime.now()
-                
-                if existing_user:
-                    # Update existing user's last login time
-                    existing_user.last_login_time = current_time
-                    logging.info(f"Updated login time for existing user: {email}")
-                else:
-                    # Create new user record
-                    new_user = UserLogin(
-                        email=email.strip().lower(),
-                        last_login_time=current_time,
-                        voice_to_text_usage_count=0,
-                        text_to_voice_usage_count=0,
-                        pdf_chat_usage_count=0
-                    )
-                    session.add(new_user)
-                    logging.info(f"Created new user record: {email}")
-                
-                session.commit()
-                return True
-                
+            # One UPSERT instead of SELECT-then-INSERT/UPDATE: half the
+            # round-trips and no ORM row hydration on the login path. The
+            # timestamp is bound in SQLAlchemy's own storage format so ORM
+            # reads keep parsing it back into a datetime.
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "INSERT INTO user_logins "
+                        "(email, last_login_time, last_login_ts, voice_to_text_usage_count, "
+                        " text_to_voice_usage_count, pdf_chat_usage_count) "
+                        "VALUES (:e, :t, :ts, 0, 0, 0) "
+                        "ON CONFLICT(email) DO UPDATE SET "
+                        "last_login_time = excluded.last_login_time, "
+                        "last_login_ts = excluded.last_login_ts"
+                    ),
+                    {"e": normalized,
+                     "t": datetime.now().isoformat(sep=" "),
+                     "ts": int(time.time())}
+                )
+            logger.debug("Recorded login for user: %s", email)
+            return True
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to record login for {email}: {e}")
+            logger.error("Failed to record login for %s: %s", email, e)
             return False
         except Exception as e:
-            logging.error(f"Unexpected error recording login for {email}: {e}")
+            logger.error("Unexpected error recording login for %s: %s", email, e)
             return False
     
     def get_user_login_info(self, email: str) -> Optional[dict]:
@@ -151,18 +296,19 @@ class UserManager:
         Returns:
             dict: User login information or None if not found
         """
-        if not email or not email.strip():
+        normalized = self._norm(email)
+        if normalized is None:
             return None
-        
+
         try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
+            with self.session_scope() as session:
+                user = session.query(UserLogin).filter(UserLogin.email == normalized).first()
                 
                 if user:
                     return {
                         "email": user.email,
                         "last_login_time": user.last_login_time,
-                        "last_login_formatted": user.last_login_time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "last_login_formatted": user.last_login_time.isoformat(sep=" ", timespec="seconds"),
                         "voice_to_text_usage_count": user.voice_to_text_usage_count,
                         "text_to_voice_usage_count": user.text_to_voice_usage_count,
                         "pdf_chat_usage_count": user.pdf_chat_usage_count
@@ -170,40 +316,48 @@ class UserManager:
                 return None
                 
         except SQLAlchemyError as e:
-            logging.error(f"Failed to get user info for {email}: {e}")
+            logger.error("Failed to get user info for %s: %s", email, e)
             return None
         except Exception as e:
-            logging.error(f"Unexpected error getting user info for {email}: {e}")
+            logger.error("Unexpected error getting user info for %s: %s", email, e)
             return None
     
-    def get_all_users(self) -> list:
+    def iter_all_users(self) -> Iterator[dict]:
         """
-        Get all registered users.
-        
-        Returns:
-            list: List of all user records
+        Stream all registered users one dict at a time.
+
+        Rows are fetched in blocks of 500 (yield_per), so memory stays
+        flat no matter how large the table grows and the first record is
+        available immediately.
+
+        Yields:
+            dict: One user record per iteration
         """
         try:
-            with self._get_session() as session:
-                users = session.query(UserLogin).all()
-                return [
-                    {
+            with self.session_scope() as session:
+                for user in session.query(UserLogin).yield_per(500):
+                    yield {
                         "email": user.email,
                         "last_login_time": user.last_login_time,
-                        "last_login_formatted": user.last_login_time.strftime("%Y-%m-%d %H:%M:%S"),
+                        "last_login_formatted": user.last_login_time.isoformat(sep=" ", timespec="seconds"),
                         "voice_to_text_usage_count": user.voice_to_text_usage_count,
                         "text_to_voice_usage_count": user.text_to_voice_usage_count,
                         "pdf_chat_usage_count": user.pdf_chat_usage_count
                     }
-                    for user in users
-                ]
-                
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to get all users: {e}")
-            return []
+            logger.error("Failed to get all users: %s", e)
         except Exception as e:
-            logging.error(f"Unexpected error getting all users: {e}")
-            return []
+            logger.error("Unexpected error getting all users: %s", e)
+
+    def get_all_users(self) -> list:
+        """
+        Get all registered users.
+
+        Returns:
+            list: List of all user records
+        """
+        return list(self.iter_all_users())
     
     def delete_user(self, email: str) -> bool:
         """
@@ -215,27 +369,33 @@ class UserManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        if not email or not email.strip():
+        normalized = self._norm(email)
+        if normalized is None:
             return False
-        
+
         try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if user:
-                    session.delete(user)
-                    session.commit()
-                    logging.info(f"Deleted user record: {email}")
-                    return True
-                else:
-                    logging.warning(f"User not found for deletion: {email}")
-                    return False
-                    
+            # One DELETE and a rowcount check instead of fetching the full
+            # row just to test existence before deleting it.
+            with self.session_scope() as session:
+                result = session.execute(
+                    delete(UserLogin).where(UserLogin.email == normalized))
+
+            if result.rowcount > 0:
+                # Drop any cached quota counts for the removed user.
+                with self._quota_cache_lock:
+                    for col in self._USAGE_COLUMNS:
+                        self._quota_cache.pop((normalized, col), None)
+                logger.info("Deleted user record: %s", email)
+                return True
+            else:
+                logger.warning("User not found for deletion: %s", email)
+                return False
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to delete user {email}: {e}")
+            logger.error("Failed to delete user %s: %s", email, e)
             return False
         except Exception as e:
-            logging.error(f"Unexpected error deleting user {email}: {e}")
+            logger.error("Unexpected error deleting user %s: %s", email, e)
             return False
     
     def get_user_count(self) -> int:
@@ -246,125 +406,103 @@ class UserManager:
             int: Number of users
         """
         try:
-            with self._get_session() as session:
-                count = session.query(UserLogin).count()
-                return count
-                
+            # Flat COUNT over the table; query(...).count() wraps the whole
+            # entity select in a subquery before counting it.
+            with self.session_scope() as session:
+                return session.execute(
+                    select(func.count(UserLogin.email))).scalar() or 0
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to get user count: {e}")
+            logger.error("Failed to get user count: %s", e)
             return 0
         except Exception as e:
-            logging.error(f"Unexpected error getting user count: {e}")
+            logger.error("Unexpected error getting user count: %s", e)
             return 0
     
-    def increment_voice_to_text_usage(self, email: str) -> bool:
-        """
-        Increment voice-to-text usage count for a user.
-        
-        Args:
-            email (str): User's email address
-            
-        Returns:
-            bool: True if successful, False otherwise
-        """
-        if not email or not email.strip():
-            return False
-        
-        try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if user:
-                    user.voice_to_text_usage_count += 1
-                    session.commit()
-                    logging.info(f"Incremented voice-to-text usage for {email}. New count: {user.voice_to_text_usage_count}")
-                    return True
-                else:
-                    logging.warning(f"User not found for voice-to-text usage increment: {email}")
-                    return False
-                    
-        except SQLAlchemyError as e:
-            logging.error(f"Failed to increment voice-to-text usage for {email}: {e}")
-            return False
-        except Exception as e:
-            logging.error(f"Unexpected error incrementing voice-to-text usage for {email}: {e}")
-            return False
-    
-    def increment_text_to_voice_usage(self, email: str) -> bool:
+    def _increment_usage(self, email: str, column: str, label: str) -> bool:
         """
-        Increment text-to-voice usage count for a user.
-        
-        Args:
-            email (str): User's email address
-            
-        Returns:
-            bool: True if successful, False otherwise
-        """
-        if not email or not email.strip():
-            return False
-        
-        try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if user:
-                    user.text_to_voice_usage_count += 1
-                    session.commit()
-                    logging.info(f"Incremented text-to-voice usage for {email}. New count: {user.text_to_voice_usage_count}")
-                    return True
-                else:
-                    logging.warning(f"User not found for text-to-voice usage increment: {email}")
-                    return False
-                    
-        except SQLAlchemyError as e:
-            logging.error(f"Failed to increment text-to-voice usage for {email}: {e}")
-            return False
-        except Exception as e:
-            logging.error(f"Unexpected error incrementing text-to-voice usage for {email}: {e}")
-            return False
-    
-    def increment_pdf_chat_usage(self, email: str) -> bool:
-        """
-        Increment PDF chat usage count for a user.
-        
+        Queue a +1 for a usage column; the background writer commits it.
+
         Args:
             email (str): User's email address
-            
+            column (str): One of _USAGE_COLUMNS
+            label (str): Human-readable feature name for log messages
+
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if the increment was accepted, False for bad input
         """
-        if not email or not email.strip():
+        normalized = self._norm(email)
+        if normalized is None:
             return False
-        
+
+        # Bump any live cached count immediately so quota checks inside the
+        # TTL window see the increment before the writer commits it; keep
+        # the expiry so the TTL still bounds the entry.
+        with self._quota_cache_lock:
+            hit = self._quota_cache.get((normalized, column))
+            if hit is not None:
+                self._quota_cache[(normalized, column)] = (hit[0], hit[1] + 1)
+        # Fire-and-forget: the background writer coalesces and commits.
+        self._write_q.put((normalized, column, 1))
+        logger.debug("Queued %s usage increment for %s", label, email)
+        return True
+
+    def _write_loop(self):
+        """Drain queued usage increments, coalescing same-key entries for
+        up to _WRITE_COALESCE_WINDOW seconds, and commit each batch in one
+        transaction. A None item flushes what is pending and stops."""
+        while True:
+            item = self._write_q.get()
+            stop = item is None
+            batch = {}
+            if not stop:
+                batch[(item[0], item[1])] = item[2]
+                deadline = time.monotonic() + self._WRITE_COALESCE_WINDOW
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._write_q.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    key = (item[0], item[1])
+                    batch[key] = batch.get(key, 0) + item[2]
+            if batch:
+                self._flush_usage_batch(batch)
+            if stop:
+                return
+
+    def _flush_usage_batch(self, batch):
+        """Apply coalesced {(email, column): delta} updates in one commit."""
         try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if user:
-                    user.pdf_chat_usage_count += 1
-                    session.commit()
-                    logging.info(f"Incremented PDF chat usage for {email}. New count: {user.pdf_chat_usage_count}")
-                    return True
-                else:
-                    logging.warning(f"User not found for PDF chat usage increment: {email}")
-                    return False
-                    
+            with self.engine.begin() as conn:
+                for (normalized, column), delta in batch.items():
+                    conn.execute(self._delta_stmts[column],
+                                 {"e": normalized, "d": delta})
         except SQLAlchemyError as e:
-            logging.error(f"Failed to increment PDF chat usage for {email}: {e}")
-            return False
+            logger.error("Failed to flush usage increments: %s", e)
         except Exception as e:
-            logging.error(f"Unexpected error incrementing PDF chat usage for {email}: {e}")
-            return False
-    
-    def check_voice_to_text_quota(self, email: str, max_daily_usage: int = 5) -> dict:
+            logger.error("Unexpected error flushing usage increments: %s", e)
+
+    def _check_quota(self, email: str, column: str, label: str,
+                     max_daily_usage: int, limit_noun: str = "tries",
+                     usage_prefix: str = "Usage") -> dict:
         """
-        Check if user has reached their daily voice-to-text quota.
-        Resets usage count if more than 24 hours have passed since last login.
-        
+        Check a usage column against its daily quota, resetting it first if
+        more than 24 hours have passed since the last login.
+
         Args:
             email (str): User's email address
-            max_daily_usage (int): Maximum allowed daily usage (default: 5)
-            
+            column (str): One of _USAGE_COLUMNS
+            label (str): Human-readable feature name for log messages
+            max_daily_usage (int): Maximum allowed daily usage
+            limit_noun (str): What the quota counts, for the limit message
+            usage_prefix (str): Prefix for the remaining-usage message
+
         Returns:
             dict: {
                 'can_use': bool,
@@ -373,54 +511,66 @@ class UserManager:
                 'message': str
             }
         """
-        if not email or not email.strip():
+        normalized = self._norm(email)
+        if normalized is None:
             return {
                 'can_use': False,
                 'current_usage': 0,
                 'max_usage': max_daily_usage,
                 'message': 'Invalid email provided'
             }
-        
+
+        def _result(current_usage):
+            if current_usage >= max_daily_usage:
+                return {
+                    'can_use': False,
+                    'current_usage': current_usage,
+                    'max_usage': max_daily_usage,
+                    'message': f'Your quota of {max_daily_usage} {limit_noun} reached. Try after 24 hours.'
+                }
+            else:
+                return {
+                    'can_use': True,
+                    'current_usage': current_usage,
+                    'max_usage': max_daily_usage,
+                    'message': f'{usage_prefix}: {current_usage}/{max_daily_usage}'
+                }
+
+        # Serve repeat checks inside the TTL window from memory; increments
+        # rewrite the cached count in place, so a fresh entry is never
+        # behind this process's own writes.
+        now = time.monotonic()
+        with self._quota_cache_lock:
+            hit = self._quota_cache.get((normalized, column))
+        if hit is not None and hit[0] > now:
+            return _result(hit[1])
+
         try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if not user:
-                    return {
-                        'can_use': False,
-                        'current_usage': 0,
-                        'max_usage': max_daily_usage,
-                        'message': 'User not found'
-                    }
-                
-                current_time = datetime.now()
-                time_diff = current_time - user.last_login_time
-                hours_since_login = time_diff.total_seconds() / 3600
-                
-                # If more than 24 hours have passed since last login, reset usage count
-                if hours_since_login > 24:
-                    user.voice_to_text_usage_count = 0
-                    session.commit()
-                    logging.info(f"Reset voice-to-text usage count for {email} (last login > 24h ago)")
-                
-                # Check if user has reached quota
-                if user.voice_to_text_usage_count >= max_daily_usage:
-                    return {
-                        'can_use': False,
-                        'current_usage': user.voice_to_text_usage_count,
-                        'max_usage': max_daily_usage,
-                        'message': f'Your quota of {max_daily_usage} tries reached. Try after 24 hours.'
-                    }
-                else:
-                    return {
-                        'can_use': True,
-                        'current_usage': user.voice_to_text_usage_count,
-                        'max_usage': max_daily_usage,
-                        'message': f'Usage: {user.voice_to_text_usage_count}/{max_daily_usage}'
-                    }
-                    
+            # The 24-hour reset and the count read happen atomically in one
+            # statement, instead of a SELECT, Python-side date arithmetic
+            # and a conditional second commit.
+            with self.engine.begin() as conn:
+                row = conn.execute(
+                    self._check_stmts[column],
+                    {"e": normalized, "now": int(time.time())}
+                ).first()
+
+            if row is None:
+                return {
+                    'can_use': False,
+                    'current_usage': 0,
+                    'max_usage': max_daily_usage,
+                    'message': 'User not found'
+                }
+
+            current_usage = row[0]
+            with self._quota_cache_lock:
+                self._quota_cache[(normalized, column)] = (
+                    now + self._QUOTA_CACHE_TTL, current_usage)
+            return _result(current_usage)
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to check voice-to-text quota for {email}: {e}")
+            logger.error("Failed to check %s quota for %s: %s", label, email, e)
             return {
                 'can_use': False,
                 'current_usage': 0,
@@ -428,159 +578,87 @@ class UserManager:
                 'message': 'Database error occurred'
             }
         except Exception as e:
-            logging.error(f"Unexpected error checking voice-to-text quota for {email}: {e}")
+            logger.error("Unexpected error checking %s quota for %s: %s", label, email, e)
             return {
                 'can_use': False,
                 'current_usage': 0,
                 'max_usage': max_daily_usage,
                 'message': 'Unexpected error occurred'
             }
-    
-    def check_text_to_voice_quota(self, email: str, max_daily_usage: int = 5) -> dict:
+
+    def _try_consume(self, email: str, column: str, label: str,
+                     max_daily_usage: int, limit_noun: str = "tries",
+                     usage_prefix: str = "Usage") -> dict:
         """
-        Check if user has reached their daily text-to-voice quota.
-        Resets usage count if more than 24 hours have passed since last login.
-        
+        Check a usage column against its daily quota and consume one unit
+        in the same statement, so concurrent callers can never both pass a
+        check and push the count past the limit.
+
+        Callers that should only charge the user after their work succeeds
+        keep using check_*_quota followed by increment_*_usage instead.
+
         Args:
             email (str): User's email address
-            max_daily_usage (int): Maximum allowed daily usage (default: 5)
-            
+            column (str): One of _USAGE_COLUMNS
+            label (str): Human-readable feature name for log messages
+            max_daily_usage (int): Maximum allowed daily usage
+            limit_noun (str): What the quota counts, for the limit message
+            usage_prefix (str): Prefix for the remaining-usage message
+
         Returns:
-            dict: {
-                'can_use': bool,
-                'current_usage': int,
-                'max_usage': int,
-                'message': str
-            }
+            dict: Same shape as _check_quota; 'can_use' True means one
+            unit was consumed and 'current_usage' includes it.
         """
-        if not email or not email.strip():
+        normalized = self._norm(email)
+        if normalized is None:
             return {
                 'can_use': False,
                 'current_usage': 0,
                 'max_usage': max_daily_usage,
                 'message': 'Invalid email provided'
             }
-        
+
         try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if not user:
+            with self.engine.begin() as conn:
+                params = {"e": normalized, "now": int(time.time()),
+                          "max": max_daily_usage}
+                row = conn.execute(self._consume_stmts[column], params).first()
+                if row is None:
+                    # No row matched: either the user doesn't exist or the
+                    # quota is exhausted; one read tells them apart.
+                    row = conn.execute(self._count_stmts[column],
+                                       {"e": normalized}).first()
+                    if row is None:
+                        return {
+                            'can_use': False,
+                            'current_usage': 0,
+                            'max_usage': max_daily_usage,
+                            'message': 'User not found'
+                        }
+                    with self._quota_cache_lock:
+                        self._quota_cache[(normalized, column)] = (
+                            time.monotonic() + self._QUOTA_CACHE_TTL, row[0])
                     return {
                         'can_use': False,
-                        'current_usage': 0,
+                        'current_usage': row[0],
                         'max_usage': max_daily_usage,
-                        'message': 'User not found'
+                        'message': f'Your quota of {max_daily_usage} {limit_noun} reached. Try after 24 hours.'
                     }
-                
-                current_time = datetime.now()
-                time_diff = current_time - user.last_login_time
-                hours_since_login = time_diff.total_seconds() / 3600
-                
-                # If more than 24 hours have passed since last login, reset usage count
-                if hours_since_login > 24:
-                    user.text_to_voice_usage_count = 0
-                    session.commit()
-                    logging.info(f"Reset text-to-voice usage count for {email} (last login > 24h ago)")
-                
-                # Check if user has reached quota
-                if user.text_to_voice_usage_count >= max_daily_usage:
-                    return {
-                        'can_use': False,
-                        'current_usage': user.text_to_voice_usage_count,
-                        'max_usage': max_daily_usage,
-                        'message': f'Your quota of {max_daily_usage} tries reached. Try after 24 hours.'
-                    }
-                else:
-                    return {
-                        'can_use': True,
-                        'current_usage': user.text_to_voice_usage_count,
-                        'max_usage': max_daily_usage,
-                        'message': f'Usage: {user.text_to_voice_usage_count}/{max_daily_usage}'
-                    }
-                    
-        except SQLAlchemyError as e:
-            logging.error(f"Failed to check text-to-voice quota for {email}: {e}")
-            return {
-                'can_use': False,
-                'current_usage': 0,
-                'max_usage': max_daily_usage,
-                'message': 'Database error occurred'
-            }
-        except Exception as e:
-            logging.error(f"Unexpected error checking text-to-voice quota for {email}: {e}")
-            return {
-                'can_use': False,
-                'current_usage': 0,
-                'max_usage': max_daily_usage,
-                'message': 'Unexpected error occurred'
-            }
-    
-    def check_pdf_chat_quota(self, email: str, max_daily_usage: int = 5) -> dict:
-        """
-        Check if user has reached their daily PDF chat quota.
-        Resets usage count if more than 24 hours have passed since last login.
-        
-        Args:
-            email (str): User's email address
-            max_daily_usage (int): Maximum allowed daily usage (default: 5)
-            
-        Returns:
-            dict: {
-                'can_use': bool,
-                'current_usage': int,
-                'max_usage': int,
-                'message': str
-            }
-        """
-        if not email or not email.strip():
+
+            current_usage = row[0]
+            with self._quota_cache_lock:
+                self._quota_cache[(normalized, column)] = (
+                    time.monotonic() + self._QUOTA_CACHE_TTL, current_usage)
+            logger.debug("Consumed %s quota unit for %s", label, email)
             return {
-                'can_use': False,
-                'current_usage': 0,
+                'can_use': True,
+                'current_usage': current_usage,
                 'max_usage': max_daily_usage,
-                'message': 'Invalid email provided'
+                'message': f'{usage_prefix}: {current_usage}/{max_daily_usage}'
             }
-        
-        try:
-            with self._get_session() as session:
-                user = session.query(UserLogin).filter(UserLogin.email == email.strip().lower()).first()
-                
-                if not user:
-                    return {
-                        'can_use': False,
-                        'current_usage': 0,
-                        'max_usage': max_daily_usage,
-                        'message': 'User not found'
-                    }
-                
-                current_time = datetime.now()
-                time_diff = current_time - user.last_login_time
-                hours_since_login = time_diff.total_seconds() / 3600
-                
-                # If more than 24 hours have passed since last login, reset usage count
-                if hours_since_login > 24:
-                    user.pdf_chat_usage_count = 0
-                    session.commit()
-                    logging.info(f"Reset PDF chat usage count for {email} (last login > 24h ago)")
-                
-                # Check if user has reached quota
-                if user.pdf_chat_usage_count >= max_daily_usage:
-                    return {
-                        'can_use': False,
-                        'current_usage': user.pdf_chat_usage_count,
-                        'max_usage': max_daily_usage,
-                        'message': f'Your quota of {max_daily_usage} PDF chat questions reached. Try after 24 hours.'
-                    }
-                else:
-                    return {
-                        'can_use': True,
-                        'current_usage': user.pdf_chat_usage_count,
-                        'max_usage': max_daily_usage,
-                        'message': f'PDF Chat Usage: {user.pdf_chat_usage_count}/{max_daily_usage}'
-                    }
-                    
+
         except SQLAlchemyError as e:
-            logging.error(f"Failed to check PDF chat quota for {email}: {e}")
+            logger.error("Failed to consume %s quota for %s: %s", label, email, e)
             return {
                 'can_use': False,
                 'current_usage': 0,
@@ -588,16 +666,66 @@ class UserManager:
                 'message': 'Database error occurred'
             }
         except Exception as e:
-            logging.error(f"Unexpected error checking PDF chat quota for {email}: {e}")
+            logger.error("Unexpected error consuming %s quota for %s: %s", label, email, e)
             return {
                 'can_use': False,
                 'current_usage': 0,
                 'max_usage': max_daily_usage,
                 'message': 'Unexpected error occurred'
             }
-    
+
+    def increment_voice_to_text_usage(self, email: str) -> bool:
+        """Increment voice-to-text usage count for a user."""
+        return self._increment_usage(email, "voice_to_text_usage_count", "voice-to-text")
+
+    def increment_text_to_voice_usage(self, email: str) -> bool:
+        """Increment text-to-voice usage count for a user."""
+        return self._increment_usage(email, "text_to_voice_usage_count", "text-to-voice")
+
+    def increment_pdf_chat_usage(self, email: str) -> bool:
+        """Increment PDF chat usage count for a user."""
+        return self._increment_usage(email, "pdf_chat_usage_count", "PDF chat")
+
+    def check_voice_to_text_quota(self, email: str, max_daily_usage: int = 5) -> dict:
+        """Check whether a user is within their daily voice-to-text quota."""
+        return self._check_quota(email, "voice_to_text_usage_count",
+                                 "voice-to-text", max_daily_usage)
+
+    def check_text_to_voice_quota(self, email: str, max_daily_usage: int = 5) -> dict:
+        """Check whether a user is within their daily text-to-voice quota."""
+        return self._check_quota(email, "text_to_voice_usage_count",
+                                 "text-to-voice", max_daily_usage)
+
+    def check_pdf_chat_quota(self, email: str, max_daily_usage: int = 5) -> dict:
+        """Check whether a user is within their daily PDF chat quota."""
+        return self._check_quota(email, "pdf_chat_usage_count", "PDF chat",
+                                 max_daily_usage,
+                                 limit_noun="PDF chat questions",
+                                 usage_prefix="PDF Chat Usage")
+
+    def try_consume_voice_to_text(self, email: str, max_daily_usage: int = 5) -> dict:
+        """Atomically check and consume one voice-to-text quota unit."""
+        return self._try_consume(email, "voice_to_text_usage_count",
+                                 "voice-to-text", max_daily_usage)
+
+    def try_consume_text_to_voice(self, email: str, max_daily_usage: int = 5) -> dict:
+        """Atomically check and consume one text-to-voice quota unit."""
+        return self._try_consume(email, "text_to_voice_usage_count",
+                                 "text-to-voice", max_daily_usage)
+
+    def try_consume_pdf_chat(self, email: str, max_daily_usage: int = 5) -> dict:
+        """Atomically check and consume one PDF chat quota unit."""
+        return self._try_consume(email, "pdf_chat_usage_count", "PDF chat",
+                                 max_daily_usage,
+                                 limit_noun="PDF chat questions",
+                                 usage_prefix="PDF Chat Usage")
+
     def close(self):
-        """Close database connections."""
+        """Flush pending usage writes and close database connections."""
+        if self._writer is not None and self._writer.is_alive():
+            self._write_q.put(None)
+            self._writer.join(timeout=5)
+        self._writer = None
         if self.engine:
             self.engine.dispose()
-            logging.info("Database connections closed")
+            logger.info("Database connections closed")